@@ -15,7 +15,7 @@ import numpy as np
 import scipy.stats
 import multiprocessing.pool
 
-from . import util
+from . import pipeline, util
 
 
 def anchor_algorithm(corpus, k, doc_threshold=500, project_dim=1000):
@@ -55,17 +55,18 @@ def build_cooccurrence(corpus):
 
     D = 0
     for doc in corpus.documents:
-        n_d = len(doc.tokens)
+        tokens = pipeline.token_types(doc.tokens)
+        n_d = len(tokens)
         if n_d <= 1:
             continue
         D += 1
 
         norm = 1 / (n_d * (n_d - 1))
-        for i, w_i in enumerate(doc.tokens):
-            for j, w_j in enumerate(doc.tokens):
+        for i, w_i in enumerate(tokens):
+            for j, w_j in enumerate(tokens):
                 if i == j:
                     continue
-                Q[w_i.token, w_j.token] += norm
+                Q[w_i, w_j] += norm
 
     return Q / D
 
@@ -98,7 +99,8 @@ def build_labeled_cooccurrence(corpus, attr_name, labeled_docs,
 
     D = 0
     for d, doc in enumerate(corpus.documents):
-        n_d = len(doc.tokens)
+        tokens = pipeline.token_types(doc.tokens)
+        n_d = len(tokens)
         if n_d <= 1:
             continue
         D += 1
@@ -106,24 +108,24 @@ def build_labeled_cooccurrence(corpus, attr_name, labeled_docs,
         if d in labeled_docs:
             norm = 1 / ((n_d + label_weight) * (n_d + label_weight - 1))
             index = label_set[doc.metadata[attr_name]]
-            for i, w_i in enumerate(doc.tokens):
-                for j, w_j in enumerate(doc.tokens):
+            for i, w_i in enumerate(tokens):
+                for j, w_j in enumerate(tokens):
                     if i == j:
                         continue
-                    Q[w_i.token, w_j.token] += norm
-                Q[w_i.token, index] += label_weight * norm
-                Q[index, w_i.token] += label_weight * norm
+                    Q[w_i, w_j] += norm
+                Q[w_i, index] += label_weight * norm
+                Q[index, w_i] += label_weight * norm
             Q[index, index] += label_weight * (label_weight - 1) * norm
         else:
             norm = 1 / (n_d * (n_d - 1) + 2 * n_d * L * smoothing + L * (L - 1) * smoothing**2)
-            for i, w_i in enumerate(doc.tokens):
-                for j, w_j in enumerate(doc.tokens):
+            for i, w_i in enumerate(tokens):
+                for j, w_j in enumerate(tokens):
                     if i == j:
                         continue
-                    Q[w_i.token, w_j.token] += norm
+                    Q[w_i, w_j] += norm
                 for j in label_set.values():
-                    Q[w_i.token, j] += norm * smoothing
-                    Q[j, w_i.token] += norm * smoothing
+                    Q[w_i, j] += norm * smoothing
+                    Q[j, w_i] += norm * smoothing
             for i in label_set.values():
                 for j in label_set.values():
                     if i == j:
@@ -147,20 +149,21 @@ def quick_Q(Q, corpus, attr_name, labeled_docs, newly_labeled_docs, labels, D,
     H = np.zeros((V+L, V+L))
     for d in newly_labeled_docs:
         doc = corpus.documents[d]
-        n_d = len(doc.tokens)
+        tokens = pipeline.token_types(doc.tokens)
+        n_d = len(tokens)
         if n_d <= 1:
             continue
 
         # Subtract the unlabeled effect of this document
         norm = 1 / (n_d * (n_d - 1) + 2 * n_d * L * smoothing + L * (L - 1) * smoothing**2)
-        for i, w_i in enumerate(doc.tokens):
-            for j, w_j in enumerate(doc.tokens):
+        for i, w_i in enumerate(tokens):
+            for j, w_j in enumerate(tokens):
                 if i == j:
                     continue
-                H[w_i.token, w_j.token] -= norm
+                H[w_i, w_j] -= norm
             for j in label_set.values():
-                H[w_i.token, j] -= norm * smoothing
-                H[j, w_i.token] -= norm * smoothing
+                H[w_i, j] -= norm * smoothing
+                H[j, w_i] -= norm * smoothing
         for i in label_set.values():
             for j in label_set.values():
                 if i == j:
@@ -170,13 +173,13 @@ def quick_Q(Q, corpus, attr_name, labeled_docs, newly_labeled_docs, labels, D,
         # Add the labeled effect of this document
         norm = 1 / ((n_d + label_weight) * (n_d + label_weight - 1))
         index = label_set[doc.metadata[attr_name]]
-        for i, w_i in enumerate(doc.tokens):
-            for j, w_j in enumerate(doc.tokens):
+        for i, w_i in enumerate(tokens):
+            for j, w_j in enumerate(tokens):
                 if i == j:
                     continue
-                H[w_i.token, w_j.token] += norm
-            H[w_i.token, index] += label_weight * norm
-            H[index, w_i.token] += label_weight * norm
+                H[w_i, w_j] += norm
+            H[w_i, index] += label_weight * norm
+            H[index, w_i] += label_weight * norm
         H[index, index] += label_weight * (label_weight - 1) * norm
     Q += H
     return Q/D
@@ -199,8 +202,8 @@ def build_supervised_cooccurrence(corpus, attr_name, labeled_docs):
     for d, doc in enumerate(corpus.documents):
         if d in labeled_docs:
             label_index = label_set[doc.metadata[attr_name]]
-            for i, w_i in enumerate(doc.tokens):
-                S[w_i.token, label_index] += 1
+            for w_i in pipeline.token_types(doc.tokens):
+                S[w_i, label_index] += 1
 
     for i in range(S.shape[0]):
 
@@ -233,7 +236,7 @@ def gram_schmidt_anchors(corpus, Q, k, doc_threshold=500, project_dim=1000, **kw
     # Find candidate anchors
     counts = collections.Counter()
     for doc in corpus.documents:
-        counts.update(set(t.token for t in doc.tokens))
+        counts.update(set(pipeline.token_types(doc.tokens)))
     candidates = [tid for tid, count in counts.items() if count > doc_threshold]
     k = min(k, len(candidates))
 
@@ -51,7 +51,7 @@ def _binary_labeler(data, threshold,
     if needs_split:
         stream = (line.rstrip(os.linesep).split(delim, 1) for line in stream)
     stream = ((key, float(value) >= threshold) for key, value in stream)
-    return pipeline.stream_labeler(stream, attr)
+    return pipeline.stream_labeler(stream, attr, lazy=not needs_split)
 
 
 def _binary_string_labeler(data, threshold,
@@ -62,7 +62,7 @@ def _binary_string_labeler(data, threshold,
         stream = (line.rstrip(os.linesep).split(delim, 1) for line in stream)
     stream = ((key, 'positive' if float(value) >= threshold else 'negative')
                for key, value in stream)
-    return pipeline.stream_labeler(stream, attr)
+    return pipeline.stream_labeler(stream, attr, lazy=not needs_split)
 
 
 def open_download(name, mode='r'):
@@ -120,8 +120,7 @@ def tripadvisor():
     p = pipeline.Pipeline(
         download_inputer('tripadvisor/tripadvisor.tar.gz'),
         pipeline.targz_extractor(regex_extractor),
-        pipeline.stopword_tokenizer(
-                pipeline.default_tokenizer(),
+        pipeline.fused_tokenizer(
                 itertools.chain(
                     open_download('stopwords/english.txt'),
                     extra_stopwords
@@ -188,8 +187,7 @@ def bible():
     p= pipeline.Pipeline(
         download_inputer('bible/bible.txt'),
         pipeline.line_extractor(),
-        pipeline.stopword_tokenizer(
-            pipeline.default_tokenizer(),
+        pipeline.fused_tokenizer(
             itertools.chain(
                 open_download('stopwords/english.txt'),
                 open_download('stopwords/jacobean.txt'),
@@ -256,8 +254,7 @@ def newsgroups():
             pipeline.skip_extractor(errors='replace'),
         ),
         pipeline.remove_tokenizer(
-            pipeline.stopword_tokenizer(
-                pipeline.default_tokenizer(),
+            pipeline.fused_tokenizer(
                 itertools.chain(open_download('stopwords/english.txt'),
                                 open_download('stopwords/newsgroups.txt'))
             ),
@@ -291,8 +288,7 @@ def amazon_medium():
     p = pipeline.Pipeline(
         download_inputer('amazon_medium/amazon_medium.json.gz'),
         pipeline.gzip_extractor(label_extractor),
-        pipeline.stopword_tokenizer(
-            pipeline.default_tokenizer(),
+        pipeline.fused_tokenizer(
             open_download('stopwords/english.txt'),
         ),
         pipeline.stream_labeler(label_stream),
@@ -314,8 +310,7 @@ def amazon():
     p = pipeline.Pipeline(
         download_inputer('amazon/amazon.txt'),
         pipeline.line_extractor('\t'),
-        pipeline.stopword_tokenizer(
-            pipeline.default_tokenizer(),
+        pipeline.fused_tokenizer(
             open_download('stopwords/english.txt'),
         ),
         pipeline.composite_labeler(
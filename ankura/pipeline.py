@@ -12,16 +12,19 @@ Pipeline can be used to import data.
 """
 
 import collections
+import collections.abc
+import concurrent.futures
 import functools
 import glob
 import gzip
 import io
+import multiprocessing
 import os
 import pickle
 import re
 import string
+import sys
 import tarfile
-import time
 
 import bs4
 import scipy.sparse
@@ -34,6 +37,42 @@ TokenLoc = collections.namedtuple('TokenLoc', 'token loc')
 Document = collections.namedtuple('Document', 'text tokens metadata')
 Corpus = collections.namedtuple('Corpus', 'documents vocabulary metadata')
 
+
+class TokenArray(object):
+    """Stores the typed TokenLoc of a Document as a pair of parallel arrays: an
+    int32 array of token types, and an Nx2 int32 array of (begin, end) locs.
+    Indexing and iteration produce TokenLoc, so a TokenArray can be used in
+    place of a list of TokenLoc.
+    """
+
+    def __init__(self, types, locs):
+        self.types = np.asarray(types, dtype=np.int32)
+        self.locs = np.asarray(locs, dtype=np.int32).reshape(-1, 2)
+
+    def __len__(self):
+        return self.types.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TokenArray(self.types[index], self.locs[index])
+        return TokenLoc(int(self.types[index]), tuple(self.locs[index].tolist()))
+
+    def __iter__(self):
+        return map(TokenLoc, self.types.tolist(), map(tuple, self.locs.tolist()))
+
+    def __repr__(self):
+        return 'TokenArray({!r})'.format(list(self))
+
+
+def token_types(tokens):
+    """Gets a list of the token types in a sequence of typed TokenLoc, reading
+    them directly from the types array if given a TokenArray.
+    """
+    if isinstance(tokens, TokenArray):
+        return tokens.types.tolist()
+    return [t.token for t in tokens]
+
+
 # Inputers are callables which generate the files a Pipeline should read.
 # The files should be opened in binary read mode. The caller is reponsible for
 # closing the file objects, although garbage collection should handle this as
@@ -42,7 +81,6 @@ Corpus = collections.namedtuple('Corpus', 'documents vocabulary metadata')
 
 def file_inputer(*filenames):
     """Generates file objects for each of the given filenames"""
-    @functools.wraps(file_inputer)
     def _inputer():
         for filename in filenames:
             yield open(filename, 'rb')
@@ -61,7 +99,6 @@ def glob_inputer(pattern):
 
 def whole_extractor(encoding='utf-8', errors='strict'):
     """Extracts the entire contents of a file as a single Text"""
-    @functools.wraps(whole_extractor)
     def _extractor(docfile):
         yield Text(docfile.name, docfile.read().decode(encoding, errors))
     return _extractor
@@ -71,7 +108,6 @@ def skip_extractor(delim='\n\n', encoding='utf-8', errors='strict'):
     """After skipping a header, extracts the remaining contents of a file as a
     single Text
     """
-    @functools.wraps(skip_extractor)
     def _extractor(docfile):
         data = docfile.read().decode(encoding, errors)
         _, data = data.split(delim, 1)
@@ -84,7 +120,6 @@ def line_extractor(delim=' ', encoding='utf-8', errors='strict'):
     delimiter as the name of the Text, and everything after as the Text data.
     Each line is stripped of leading and trailing whitespace before processing.
     """
-    @functools.wraps(line_extractor)
     def _extractor(docfile):
         for line in docfile:
             line = line.decode(encoding, errors).strip()
@@ -93,43 +128,60 @@ def line_extractor(delim=' ', encoding='utf-8', errors='strict'):
     return _extractor
 
 
+_NEWLINE_RE = re.compile(r'\n\n+')
+
+
 def html_extractor(encoding='utf-8', errors='strict'):
     """Extracts the text content of an HTML file as a single Text. Blank lines
     are removed from the result, and both leading and trailing whitespace are
     stripped.
     """
-    newline = re.compile(r'\n\n+')
-    @functools.wraps(html_extractor)
     def _extractor(docfile):
         raw = docfile.read().decode(encoding, errors)
         soup = bs4.BeautifulSoup(raw, 'html.parser')
         text = soup.get_text()
-        text = newline.sub('\n', text)
+        text = _NEWLINE_RE.sub('\n', text)
         text = text.strip()
         yield Text(docfile.name, text)
     return _extractor
 
 
+_READ_BUFFER_SIZE = 1 << 17
+
+
 def gzip_extractor(base_extractor):
     """Passes the uncompressed contents of a file object to a base extractor"""
-    @functools.wraps(gzip_extractor)
     def _extractor(docfile):
-        return base_extractor(gzip.GzipFile(fileobj=docfile))
+        compressed = io.BufferedReader(docfile, buffer_size=_READ_BUFFER_SIZE)
+        raw = gzip.GzipFile(fileobj=compressed)
+        return base_extractor(io.BufferedReader(raw, buffer_size=_READ_BUFFER_SIZE))
     return _extractor
 
 
+class _NamedReader(io.BufferedReader):
+    """BufferedReader which reports the given name rather than the name of the
+    underlying raw stream
+    """
+
+    def __init__(self, raw, name, buffer_size=_READ_BUFFER_SIZE):
+        super().__init__(raw, buffer_size)
+        self._name = name
+
+    @property
+    def name(self):
+        return self._name
+
+
 def tar_extractor(base_extractor):
     """Passes each file in a tar archive to a base extractor and aggregates the
     results
     """
-    @functools.wraps(tar_extractor)
     def _extractor(docfile):
         archive = tarfile.TarFile(fileobj=docfile, mode='r')
         for info in archive:
             if not info.isfile():
                 continue
-            member = io.BytesIO(archive.extractfile(info.name).read())
-            member.name = info.name
+            member = _NamedReader(archive.extractfile(info), info.name)
             for text in base_extractor(member):
                 yield text
     return _extractor
@@ -147,24 +199,29 @@ def targz_extractor(base_extractor):
 # input a single string, and return a list of TokenLoc.
 
 
+@functools.lru_cache(maxsize=None)
+def _re_compile(pattern):
+    return re.compile(pattern)
+
+
+@functools.lru_cache(maxsize=None)
+def _re_search(pattern):
+    return _re_compile(pattern).search
+
+
+def _split_pattern(delims):
+    if not delims:
+        return r'[\s\S]+'
+    return '[^' + re.escape(delims) + ']+'
+
+
 def split_tokenizer(delims=string.whitespace):
     """Splits data on delimiting characters. The default delims are
     whitespace characters.
     """
-    @functools.wraps(split_tokenizer)
+    token_re = _re_compile(_split_pattern(delims))
     def _tokenizer(data):
-        tokens = []
-        begin = -1 # Set to -1 when looking for start of token
-        for i, char in enumerate(data):
-            if char in delims:
-                if begin >= 0:
-                    tokens.append(TokenLoc(data[begin: i], (begin, i)))
-                    begin = -1
-            elif begin == -1:
-                begin = i
-        if begin >= 0: # Last token might be at EOF
-            tokens.append(TokenLoc(data[begin:], (begin, len(data)-1)))
-        return tokens
+        return [TokenLoc(m.group(), m.span()) for m in token_re.finditer(data)]
     return _tokenizer
 
 
@@ -178,12 +235,10 @@ def translate_tokenizer(base_tokenizer, table=_LOWER_DELPUNCT_TABLE):
     with the given mapping. Empty tokens after the translate are removed. The
     default table maps uppercase letters to lowercase, and removes punctuation
     """
-    @functools.wraps(translate_tokenizer)
     def _tokenizer(data):
         tokens = base_tokenizer(data)
-        tokens = [TokenLoc(t.token.translate(table), t.loc) for t in tokens]
-        tokens = [t for t in tokens if t.token]
-        return tokens
+        return [TokenLoc(sys.intern(token), t.loc) for t in tokens
+                if (token := t.token.translate(table))]
     return _tokenizer
 
 
@@ -191,7 +246,7 @@ def default_tokenizer():
     """Splits the data on whitespace, lowercases the tokens, and removes
     punctuation. Empty tokens are removed.
     """
-    return translate_tokenizer(split_tokenizer())
+    return fused_tokenizer()
 
 
 def regex_tokenizer(base_tokenizer, pattern, repl):
@@ -200,13 +255,11 @@ def regex_tokenizer(base_tokenizer, pattern, repl):
     part of it matches the regular expression, so it may be desirable to use ^
     and $ anchors to match the entire token.
     """
-    combine_re = re.compile(pattern).search
-    combine = lambda t: TokenLoc(repl, t.loc) if combine_re(t.token) else t
-    @functools.wraps(regex_tokenizer)
+    combine_re = _re_search(pattern)
     def _tokenizer(data):
         tokens = base_tokenizer(data)
-        tokens = [combine(t) for t in tokens]
-        return tokens
+        return [TokenLoc(repl, t.loc) if combine_re(t.token) else t
+                for t in tokens]
     return _tokenizer
 
 
@@ -216,8 +269,7 @@ def remove_tokenizer(base_tokenizer, pattern):
     part of it matches the regular expression, so it may be desirable to use ^
     and $ anchors to match the entire token.
     """
-    remove_re = re.compile(pattern).search
-    @functools.wraps(remove_tokenizer)
+    remove_re = _re_search(pattern)
     def _tokenizer(data):
         tokens = base_tokenizer(data)
         tokens = [t for t in tokens if not remove_re(t.token)]
@@ -226,7 +278,9 @@ def remove_tokenizer(base_tokenizer, pattern):
 
 
 def _tokenset(tokens, strip):
-    return set(t.strip() for t in tokens) if strip else set(tokens)
+    if strip:
+        tokens = (t.strip() for t in tokens)
+    return frozenset(sys.intern(t) for t in tokens)
 
 
 def combine_tokenizer(base_tokenizer, combine, repl, strip=True):
@@ -236,12 +290,10 @@ def combine_tokenizer(base_tokenizer, combine, repl, strip=True):
     stripped.
     """
     combine_set = _tokenset(combine, strip)
-    combine = lambda t: TokenLoc(repl, t.loc) if t.token in combine_set else t
-    @functools.wraps(combine_tokenizer)
     def _tokenizer(data):
         tokens = base_tokenizer(data)
-        tokens = [combine(t) for t in tokens]
-        return tokens
+        return [TokenLoc(repl, t.loc) if t.token in combine_set else t
+                for t in tokens]
     return _tokenizer
 
 
@@ -252,7 +304,6 @@ def stopword_tokenizer(base_tokenizer, stopwords, strip=True):
     stripped.
     """
     stopword_set = _tokenset(stopwords, strip)
-    @functools.wraps(stopword_tokenizer)
     def _tokenizer(data):
         tokens = base_tokenizer(data)
         tokens = [t for t in tokens if t.token not in stopword_set]
@@ -260,7 +311,79 @@ def stopword_tokenizer(base_tokenizer, stopwords, strip=True):
     return _tokenizer
 
 
-def frequency_tokenizer(pipeline, rare=None, common=None):
+def fused_tokenizer(stopwords=(), strip=True, delims=string.whitespace,
+                    table=_LOWER_DELPUNCT_TABLE):
+    """Splits data on delimiting characters, translates each token with the
+    given table, and removes empty tokens as well as tokens which appear in a
+    stopword list, all in a single pass over the data. The result is the same
+    as combining split_tokenizer, translate_tokenizer and stopword_tokenizer,
+    but without building an intermediate list of TokenLoc for each step.
+    """
+    token_re = _re_compile(_split_pattern(delims))
+    stopword_set = _tokenset(stopwords, strip)
+    def _tokenizer(data):
+        tokens = []
+        for match in token_re.finditer(data):
+            token = sys.intern(match.group().translate(table))
+            if token and token not in stopword_set:
+                tokens.append(TokenLoc(token, match.span()))
+        return tokens
+    return _tokenizer
+
+
+_count_tokenizer = None
+
+
+def _init_count_worker(tokenizer):
+    global _count_tokenizer
+    _count_tokenizer = tokenizer
+
+
+def _count_batch(batch):
+    counts = collections.Counter()
+    for data in batch:
+        counts.update({t.token for t in _count_tokenizer(data)})
+    return counts
+
+
+def _batch_texts(texts, batch_size):
+    batch = []
+    for text in texts:
+        batch.append(text.data)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _document_counts(texts, tokenizer, processes, batch_size=1000):
+    """Counts the number of texts each token appears in. If processes is
+    greater than one, the texts are tokenized by a pool of forked worker
+    processes which inherit the tokenizer, so it need not be picklable.
+    """
+    counts = collections.Counter()
+    if processes is None or processes <= 1:
+        for text in texts:
+            counts.update({t.token for t in tokenizer(text.data)})
+        return counts
+
+    context = multiprocessing.get_context('fork')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes,
+                                                mp_context=context,
+                                                initializer=_init_count_worker,
+                                                initargs=(tokenizer,)) as executor:
+        pending = collections.deque()
+        for batch in _batch_texts(texts, batch_size):
+            pending.append(executor.submit(_count_batch, batch))
+            if len(pending) > 2 * processes:
+                counts.update(pending.popleft().result())
+        for future in pending:
+            counts.update(future.result())
+    return counts
+
+
+def frequency_tokenizer(pipeline, rare=None, common=None, processes=None):
     """Transforms the output of Pipeline tokenizer to remove rare and common
     words according to the given thresholds. Rare tokens are tokens which
     appear in a smaller number of documents than the given rare threshold.
@@ -270,7 +393,10 @@ def frequency_tokenizer(pipeline, rare=None, common=None):
 
     Note that in order to determine how many documents each token appears in,
     much of the import must be run. Consequently, the construction of this
-    tokenizer may take significant time.
+    tokenizer may take significant time. If processes is greater than one,
+    documents are still extracted in the calling process, but are tokenized
+    and counted by that many forked worker processes. Forking is not available
+    on every platform, so by default the counting is done serially.
     """
     pipeline_inputer = pipeline.inputer
     pipeline_extractor = pipeline.extractor
@@ -285,18 +411,14 @@ def frequency_tokenizer(pipeline, rare=None, common=None):
         else:
             return pipeline_tokenizer
 
-        counts = collections.defaultdict(int)
-        for docfile in pipeline_inputer():
-            for text in pipeline_extractor(docfile):
-                tokens = {t.token for t in pipeline_tokenizer(text.data)}
-                for token in tokens:
-                    counts[token] += 1
+        texts = (text for docfile in pipeline_inputer()
+                      for text in pipeline_extractor(docfile))
+        counts = _document_counts(texts, pipeline_tokenizer, processes)
 
         stopwords = [t for t, c in counts.items() if not keep(c)]
         return stopword_tokenizer(pipeline_tokenizer, stopwords)
 
     tokenizer = None
-    @functools.wraps(frequency_tokenizer)
     def _tokenizer(data):
         nonlocal tokenizer
         if tokenizer is None:
@@ -312,7 +434,6 @@ def frequency_tokenizer(pipeline, rare=None, common=None):
 
 def noop_labeler():
     """Returns an empty labeler"""
-    @functools.wraps(noop_labeler)
     def _labeler(_name):
         return {}
     return _labeler
@@ -320,7 +441,6 @@ def noop_labeler():
 
 def title_labeler(attr='title'):
     """Returns a labeler with the name as the value"""
-    @functools.wraps(title_labeler)
     def _labeler(name):
         return {attr: name}
     return _labeler
@@ -328,23 +448,40 @@ def title_labeler(attr='title'):
 
 def dir_labeler(attr='dirname'):
     """Returns a labeler with the dirname of the name as the value"""
-    @functools.wraps(dir_labeler)
     def _labeler(name):
         return {attr: os.path.dirname(name)}
     return _labeler
 
 
-def stream_labeler(stream, attr='label'):
+def stream_labeler(stream, attr='label', lazy=False):
     """Returns a labeler backed by an iterable containing key-value tuples.
-    Assuming the iterable yields labels in the same order they are requested,
-    iter_labeler requires no extra memory. If this assumption is violated,
-    label are cached as needed.
+    By default, the first time a name is missing from the cache, everything
+    the iterable currently yields is read into the cache, so each lookup is a
+    single dict access regardless of the order labels are requested in. Later
+    misses only read labels added since the previous read, resuming a
+    sequence such as a list from where that read stopped. If lazy is True,
+    the iterable is instead only consumed up to the requested name, which is
+    required for a one-shot iterator whose source is still growing. Assuming
+    the iterable yields labels in the same order they are requested, the lazy
+    labeler requires no extra memory. If this assumption is violated, label
+    are cached as needed.
     """
     cache = {}
-    @functools.wraps(stream_labeler)
+    consumed = 0
     def _labeler(name):
+        nonlocal consumed
         if name in cache:
             return {attr: cache.pop(name)}
+        if not lazy:
+            if isinstance(stream, collections.abc.Sequence):
+                items = stream[consumed:]
+                consumed += len(items)
+            else:
+                items = stream
+            cache.update(items)
+            if name in cache:
+                return {attr: cache.pop(name)}
+            raise KeyError(name)
         for key, value in stream:
             if key == name:
                 return {attr: value}
@@ -354,38 +491,38 @@ def stream_labeler(stream, attr='label'):
     return _labeler
 
 
-def string_labeler(data, attr='label', delim='\t'):
+def string_labeler(data, attr='label', delim='\t', lazy=False):
     """Returns an iter_labeler from a data stream. Each line in the data should
     contain a name/label pair, separated by a delimiter, with the value being a
-    string.
+    string. The lines are read eagerly unless lazy is True.
     """
     stream = (line.rstrip(os.linesep).split(delim, 1) for line in data)
-    return stream_labeler(stream, attr)
+    return stream_labeler(stream, attr, lazy)
 
 
-def float_labeler(data, attr='label', delim='\t'):
+def float_labeler(data, attr='label', delim='\t', lazy=False):
     """Returns an iter_labeler from a data stream. Each line in the data should
     contain a single name/value pair, separated a delimiter, with the value
-    being parsable as a float.
+    being parsable as a float. The lines are read eagerly unless lazy is True.
     """
     stream = (line.rstrip(os.linesep).split(delim, 1) for line in data)
     stream = ((key, float(value)) for key, value in stream)
-    return stream_labeler(stream, attr)
+    return stream_labeler(stream, attr, lazy)
 
 
-def list_labeler(data, attr='label', delim='\t', sep=','):
+def list_labeler(data, attr='label', delim='\t', sep=',', lazy=False):
     """Returns an iter_labeler from a data stream. Each line in the data should
     contain a key/value pair, separated by a delimiter, with the value being a
-    list of string retrieved by spliting on a separator.
+    list of string retrieved by spliting on a separator. The lines are read
+    eagerly unless lazy is True.
     """
     stream = (line.rstrip(os.linesep).split(delim, 1) for line in data)
     stream = ((key, value.split(sep)) for key, value in stream)
-    return stream_labeler(stream, attr)
+    return stream_labeler(stream, attr, lazy)
 
 
 def composite_labeler(*labelers):
     """Returns a labeling with the merged results of several labelers"""
-    @functools.wraps(composite_labeler)
     def _labeler(name):
         labels = {}
         for labeler in labelers:
@@ -399,7 +536,6 @@ def composite_labeler(*labelers):
 
 def keep_filterer():
     """Always returns True reguardless of the Document"""
-    @functools.wraps(keep_filterer)
     def _filterer(_doc):
         return True
     return _filterer
@@ -409,7 +545,6 @@ def length_filterer(threshold=1):
     """Returns True if the number of tokens in the document is at or above the
     given threshold. The default threshold of 1 filters out empty documents.
     """
-    @functools.wraps(length_filterer)
     def _filterer(doc):
         return len(doc.tokens) >= threshold
     return _filterer
@@ -422,7 +557,6 @@ def length_filterer(threshold=1):
 
 def num_docs_informer(attr='num_docs'):
     """Gets the number of documents in the corpus."""
-    @functools.wraps(num_docs_informer)
     def _informer(corpus):
         return {attr: len(corpus.documents)}
     return _informer
@@ -430,7 +564,6 @@ def num_docs_informer(attr='num_docs'):
 
 def vocab_size_informer(attr='vocab_size'):
     """Gets the size of the corpus vocabulary."""
-    @functools.wraps(vocab_size_informer)
     def _informer(corpus):
         return {attr: len(corpus.vocabulary)}
     return _informer
@@ -438,7 +571,6 @@ def vocab_size_informer(attr='vocab_size'):
 
 def docwords_informer(attr='docwords'):
     """Uses build_docwords to pre-compute a sparse docwords matrix."""
-    @functools.wraps(docwords_informer)
     def _informer(corpus):
         return {attr: build_docwords(corpus)}
     return _informer
@@ -446,7 +578,6 @@ def docwords_informer(attr='docwords'):
 
 def kwargs_informer(**kwargs):
     """Returns an informer which simply passes through keyword arguments."""
-    @functools.wraps(kwargs_informer)
     def _informer(corpus):
         return kwargs
     return _informer
@@ -454,7 +585,6 @@ def kwargs_informer(**kwargs):
 
 def composite_informer(*informers):
     """Returns an informer with the merged results of several informers."""
-    @functools.wraps(composite_informer)
     def _informer(corpus):
         metadata = {}
         for informer in informers:
@@ -476,17 +606,23 @@ class VocabBuilder(object):
         self.types = {}
 
     def __getitem__(self, token):
-        if token not in self.types:
-            self.types[token] = len(self.tokens)
+        tid = self.types.get(token)
+        if tid is None:
+            token = sys.intern(token)
+            tid = len(self.tokens)
+            self.types[token] = tid
             self.tokens.append(token)
-        return self.types[token]
+        return tid
 
     def __contains__(self, token):
         return token in self.types
 
     def convert(self, tokens):
-        """Converts a sequence of TokenLoc to use types"""
-        return [TokenLoc(self[t.token], t.loc) for t in tokens]
+        """Converts a sequence of TokenLoc to a TokenArray of types"""
+        tokens = list(tokens)
+        types = np.fromiter((self[t.token] for t in tokens), np.int32, len(tokens))
+        locs = [t.loc for t in tokens]
+        return TokenArray(types, locs)
 
 
 class HashedVocabBuilder(VocabBuilder):
@@ -500,17 +636,37 @@ class HashedVocabBuilder(VocabBuilder):
         self.indices = {}
 
     def __getitem__(self, token):
-        if token not in self.types:
-            key = hash(token) % self.size
-            if key not in self.indices:
-                self.indices[key] = len(self.buckets)
-                self.buckets.append(collections.defaultdict(int))
-            self.types[token] = self.indices[key]
-
-        tid = self.types[token]
+        tid = self._lookup(token)
         self.buckets[tid][token] += 1
         return tid
 
+    def _lookup(self, token):
+        tid = self.types.get(token)
+        if tid is None:
+            token = sys.intern(token)
+            key = hash(token) % self.size
+            tid = self.indices.get(key)
+            if tid is None:
+                tid = len(self.buckets)
+                self.indices[key] = tid
+                self.buckets.append(collections.Counter())
+            self.types[token] = tid
+        return tid
+
+    def convert(self, tokens):
+        """Converts a sequence of TokenLoc to a TokenArray of types, updating
+        the bucket counts once per unique token rather than once per token.
+        """
+        tokens = list(tokens)
+        counts = collections.Counter(t.token for t in tokens)
+        types = {}
+        for token, count in counts.items():
+            tid = types[token] = self._lookup(token)
+            self.buckets[tid][token] += count
+        types = np.fromiter((types[t.token] for t in tokens), np.int32, len(tokens))
+        locs = [t.loc for t in tokens]
+        return TokenArray(types, locs)
+
     @property
     def tokens(self):
         """Gets a list of tokens by representing each bucket by its most
@@ -519,28 +675,31 @@ class HashedVocabBuilder(VocabBuilder):
         return [max(b, key=b.get) for b in self.buckets]
 
 
+_STREAM_BUFFER_SIZE = 1 << 20
+
+
 class DocumentStream(object):
     """A file-backed document stream for large document collections"""
 
     def __init__(self, filename):
         self._path = filename
-        self._file = open(filename, 'wb')
+        self._file = open(filename, 'wb', buffering=_STREAM_BUFFER_SIZE)
         self._flushed = True
         self._size = 0
 
     def append(self, doc):
         """Writes the document to the backing file."""
         if self._file is None:
-            self._file = open(self._path, 'ab')
+            self._file = open(self._path, 'ab', buffering=_STREAM_BUFFER_SIZE)
 
-        pickle.dump(doc, self._file)
+        pickle.dump(doc, self._file, pickle.HIGHEST_PROTOCOL)
         self._size += 1
         self._flushed = False
 
     def __iter__(self):
         self._flush()
 
-        with open(self._path, 'rb') as docs:
+        with open(self._path, 'rb', buffering=_STREAM_BUFFER_SIZE) as docs:
             for _ in range(self._size):
                 yield pickle.load(docs)
 
@@ -576,7 +735,8 @@ class Pipeline(object):
     def run(self, pickle_path=None, docs_path=None, hash_size=None):
         """Creates a new Corpus using the Pipeline"""
         if pickle_path and os.path.exists(pickle_path):
-            return pickle.load(open(pickle_path, 'rb'))
+            with open(pickle_path, 'rb', buffering=_STREAM_BUFFER_SIZE) as f:
+                return pickle.load(f)
 
         documents = DocumentStream(docs_path) if docs_path else []
         vocab = HashedVocabBuilder(hash_size) if hash_size else VocabBuilder()
@@ -594,7 +754,8 @@ class Pipeline(object):
             corpus.metadata.update(self.informer(corpus))
 
         if pickle_path:
-            pickle.dump(corpus, open(pickle_path, 'wb'))
+            with open(pickle_path, 'wb', buffering=_STREAM_BUFFER_SIZE) as f:
+                pickle.dump(corpus, f, pickle.HIGHEST_PROTOCOL)
         return corpus
 
 
@@ -609,11 +770,20 @@ def build_docwords(corpus, V=None):
     if V is None:
         V = len(corpus.vocabulary)
 
-    docwords = scipy.sparse.lil_matrix((D, V))
+    lengths = np.empty(D, dtype=np.int32)
+    cols = []
     for d, doc in enumerate(corpus.documents):
-        for tl in doc.tokens:
-            docwords[d, tl.token] += 1
+        lengths[d] = len(doc.tokens)
+        if isinstance(doc.tokens, TokenArray):
+            cols.append(doc.tokens.types)
+        else:
+            cols.append(np.fromiter((tl.token for tl in doc.tokens), np.int32, lengths[d]))
+    rows = np.repeat(np.arange(D, dtype=np.int32), lengths)
+    cols = np.concatenate(cols) if cols else np.empty(0, np.int32)
 
+    # Duplicate (d, w) entries are summed on conversion out of coo format
+    data = np.ones(len(rows))
+    docwords = scipy.sparse.coo_matrix((data, (rows, cols)), shape=(D, V))
     return docwords.tocsc()
 
 def remove_nonexistent_train_words(train, test):
@@ -629,8 +799,9 @@ def remove_nonexistent_train_words(train, test):
         new_tokens = list()
         for t in doc.tokens:
             vocab_word = old_vocab[t.token]
-            new_tokens.append(TokenLoc(new_vocab[vocab_word], t.loc))
+            new_tokens.append(TokenLoc(vocab_word, t.loc))
 
+        new_tokens = new_vocab.convert(new_tokens)
         new_train_documents.append(Document(doc.text, new_tokens, doc.metadata))
 
     new_test_documents = list()
@@ -639,8 +810,9 @@ def remove_nonexistent_train_words(train, test):
         for t in doc.tokens:
             vocab_word = old_vocab[t.token]
             if vocab_word in new_vocab:
-                new_tokens.append(TokenLoc(new_vocab[vocab_word], t.loc))
+                new_tokens.append(TokenLoc(vocab_word, t.loc))
 
+        new_tokens = new_vocab.convert(new_tokens)
         new_test_documents.append(Document(doc.text, new_tokens, doc.metadata))
 
     train = Corpus(new_train_documents, new_vocab.tokens, train.metadata)
@@ -650,9 +822,7 @@ def remove_nonexistent_train_words(train, test):
 
 def train_test_split(corpus, num_train=None, num_test=None, random_seed=None, remove_testonly_words=True, **kwargs):
 
-    if not random_seed:
-        random_seed = time.time()
-    np.random.seed(int(random_seed))
+    rng = np.random.default_rng(None if random_seed is None else int(random_seed))
 
     if not num_train and not num_test:
         num_train = int(len(corpus.documents) * .8)
@@ -663,7 +833,7 @@ def train_test_split(corpus, num_train=None, num_test=None, random_seed=None, re
         num_test = len(corpus.documents) - num_train
 
     try:
-        doc_ids = np.random.permutation(len(corpus.documents))
+        doc_ids = rng.permutation(len(corpus.documents))
         train_ids, test_ids = doc_ids[:num_train], doc_ids[num_train: num_train+num_test]
         train = Corpus([corpus.documents[d] for d in train_ids], corpus.vocabulary, corpus.metadata)
         test = Corpus([corpus.documents[d] for d in test_ids], corpus.vocabulary, corpus.metadata)
@@ -680,8 +850,8 @@ def train_test_split(corpus, num_train=None, num_test=None, random_seed=None, re
                 sample.append(doc)
                 doc_ids.append(i)
 
-            elif np.random.random() < (sample_size / i):
-                replace_index = np.random.randint(len(sample))
+            elif rng.random() < (sample_size / i):
+                replace_index = rng.integers(len(sample))
                 sample[replace_index] = doc
                 doc_ids[replace_index] = i
 
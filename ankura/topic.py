@@ -57,11 +57,12 @@ def sampling_assign(corpus, topics, theta_attr=None, z_attr=None, alpha=.01, num
         for z_dn in z_d:
             c[d, z_dn] += 1
 
+    w = [pipeline.token_types(doc.tokens) for doc in corpus.documents]
     for _ in range(num_iters):
-        for d, (doc, z_d) in enumerate(zip(corpus.documents, z)):
-            for n, w_dn in enumerate(doc.tokens):
+        for d, (w_d, z_d) in enumerate(zip(w, z)):
+            for n, w_dn in enumerate(w_d):
                 c[d, z_d[n]] -= 1
-                cond = [alpha + c[d, t] * topics[w_dn.token, t] for t in range(T)]
+                cond = alpha + c[d] * topics[w_dn]
                 z_d[n] = util.sample_categorical(cond)
                 c[d, z_d[n]] += 1
 
@@ -108,7 +109,7 @@ def gensim_assign(corpus, topics, theta_attr=None, z_attr=None, needs_assign=Non
         raise ValueError('Either theta_attr or z_attr must be given')
 
     # Convert corpus to gensim bag-of-words format
-    bows = [list(collections.Counter(tok.token for tok in doc.tokens).items())
+    bows = [list(collections.Counter(pipeline.token_types(doc.tokens)).items())
                 for d, doc in enumerate(corpus.documents)
                 if needs_assign is None or d in needs_assign]
 
@@ -128,7 +129,7 @@ def gensim_assign(corpus, topics, theta_attr=None, z_attr=None, needs_assign=Non
             if theta_attr:
                 doc.metadata[theta_attr] = gamma[0] / gamma[0].sum()
             if z_attr:
-                w = [t.token for t in doc.tokens]
+                w = pipeline.token_types(doc.tokens)
                 doc.metadata[z_attr] = phi.argmax(axis=0)[w].tolist()
 
 def cross_reference(corpus, attr, doc=None, n=sys.maxsize, threshold=1):
@@ -180,8 +181,8 @@ def free_classifier(topics, Q, labels, epsilon=1e-7):
     def _classifier(doc, attr='theta'):
         """The document classifier returned by free_classifier"""
         H = np.zeros(V)
-        for w_d in doc.tokens:
-            H[w_d.token] += 1
+        for w_d in pipeline.token_types(doc.tokens):
+            H[w_d] += 1
 
         topic_score = A_f.dot(doc.metadata[attr])
         topic_score /= topic_score.sum(axis=0)
@@ -229,8 +230,8 @@ def free_classifier_revised(topics, Q, labels, epsilon=1e-7):
     def _classifier(doc, attr='theta'):
         """The document classifier returned by free_classifier_revised"""
         H = np.zeros(V)
-        for w_d in doc.tokens:
-            H[w_d.token] += 1
+        for w_d in pipeline.token_types(doc.tokens):
+            H[w_d] += 1
 
         # normalize H
         H = H / H.sum(axis=0)
@@ -319,7 +320,7 @@ def free_classifier_dream(corpus, attr_name, labeled_docs,
         instead of the label name.
         """
         results = np.copy(log_lambda)
-        token_counter = collections.Counter(tok.token for tok in doc.tokens)
+        token_counter = collections.Counter(pipeline.token_types(doc.tokens))
         for l in range(L):
             for w_i in token_counter:
                 m = token_counter[w_i] * np.sum(C_f[:, l] * A_w[w_i, :])
@@ -360,6 +361,7 @@ def free_classifier_line_model(corpus, attr_name, labeled_docs,
     def _classifier(doc):
         l = np.random.randint(L)
         z = np.random.randint(K, size=len(doc.tokens))
+        w = pipeline.token_types(doc.tokens)
 
         for _ in range(num_iters):
             doc_topic_count = collections.Counter(z) # maps topic assignments to counts (this used to be outside of the for loop)
@@ -369,9 +371,9 @@ def free_classifier_line_model(corpus, attr_name, labeled_docs,
                     l_cond[s] += count * np.log(C_f[topic, s]) # not in log space: cond[s] *= C_f[topic, s]**count
             l = util.sample_log_categorical(l_cond)
 
-            for n, w_n in enumerate(doc.tokens):
+            for n, w_n in enumerate(w):
                 doc_topic_count[z[n]] -= 1
-                z_cond = C_f[:K,l] * A[w_n.token,:K] # z_cond = [C_f[t, l] * A[w_n.token, t] for t in range(K)] # eq 2
+                z_cond = C_f[:K,l] * A[w_n,:K] # z_cond = [C_f[t, l] * A[w_n, t] for t in range(K)] # eq 2
                 z[n] = util.sample_categorical(z_cond)
                 doc_topic_count[z[n]] += 1
 
@@ -397,6 +399,7 @@ def free_classifier_v_model(corpus, attr_name, labeled_docs,
     def _classifier(doc):
         l = np.random.randint(L)
         z = np.random.randint(K, size=len(doc.tokens))
+        w = pipeline.token_types(doc.tokens)
 
         for _ in range(num_iters):
             doc_topic_count = collections.Counter(z) # maps topic assignments to counts
@@ -405,9 +408,9 @@ def free_classifier_v_model(corpus, attr_name, labeled_docs,
             l = util.sample_categorical(l_cond)
             B = l_cond[l] # B is a constant (summation of A_f[l, z_i])
 
-            for n, w_n in enumerate(doc.tokens):
+            for n, w_n in enumerate(w):
                 B -= A_f[l, z[n]]
-                z_cond = [A[w_n.token, t] * (A_f[l, t] + B) for t in range(K)]
+                z_cond = A[w_n] * (A_f[l] + B)
                 z[n] = util.sample_categorical(z_cond)
                 B += A_f[l, z[n]]
 
@@ -32,16 +32,44 @@ def logsumexp(y):
     return ymax + np.log((np.exp(y - ymax)).sum())
 
 
+# Below these sizes a Python loop over the counts is faster than cumsum and
+# searchsorted, which for lists must also pay for the conversion to an array.
+_SEARCHSORTED_MIN_LIST = 128
+_SEARCHSORTED_MIN_ARRAY = 32
+
+
 def sample_categorical(counts):
     """Samples from a categorical distribution parameterized by unnormalized
     counts. The index of the sampled category is returned.
     """
-    sample = np.random.uniform(0, sum(counts))
-    for key, count in enumerate(counts):
-        if sample < count:
-            return key
-        sample -= count
-    raise ValueError(counts)
+    if isinstance(counts, np.ndarray):
+        min_size = _SEARCHSORTED_MIN_ARRAY
+    else:
+        min_size = _SEARCHSORTED_MIN_LIST
+    if len(counts) < min_size:
+        sample = np.random.uniform(0, sum(counts))
+        for key, count in enumerate(counts):
+            if sample < count:
+                return key
+            sample -= count
+        raise ValueError(counts)
+
+    cdf = np.cumsum(counts)
+    key = np.searchsorted(cdf, np.random.uniform(0, cdf[-1]), side='right')
+    if key == len(cdf):
+        raise ValueError(counts)
+    return int(key)
+
+
+def sample_categorical_batch(counts, n):
+    """Draws n samples from a categorical distribution parameterized by
+    unnormalized counts. An array of the sampled category indices is returned.
+    """
+    cdf = np.cumsum(counts)
+    keys = np.searchsorted(cdf, np.random.uniform(0, cdf[-1], n), side='right')
+    if (keys == len(cdf)).any():
+        raise ValueError(counts)
+    return keys
 
 
 def sample_log_categorical(log_counts):
@@ -51,17 +79,8 @@ def sample_log_categorical(log_counts):
     return np.argmax(log_counts + np.random.gumbel(size=len(log_counts)));
 
 
-class memoize(object):
-    """Decorator for memoizing a function."""
-
-    def __init__(self, func):
-        self.func = func
-        self.cache = {}
-
-    def __call__(self, *args):
-        if args not in self.cache:
-            self.cache[args] = self.func(*args)
-        return self.cache[args]
+# Decorator for memoizing a function.
+memoize = functools.lru_cache(maxsize=None)
 
 
 def pickle_cache(pickle_path):
@@ -70,9 +89,11 @@ def pickle_cache(pickle_path):
         @functools.wraps(data_func)
         def _wrapper():
             if os.path.exists(pickle_path):
-                return pickle.load(open(pickle_path, 'rb'))
+                with open(pickle_path, 'rb') as f:
+                    return pickle.load(f)
             data = data_func()
-            pickle.dump(data, open(pickle_path, 'wb'))
+            with open(pickle_path, 'wb') as f:
+                pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
             return data
         return _wrapper
     return _decorator
@@ -8,6 +8,8 @@ import numpy as np
 
 from sklearn.linear_model import LogisticRegression
 
+from . import pipeline
+
 
 class Contingency(object):
     """Contingency is a table which gives the multivariate frequency
@@ -186,12 +188,12 @@ def anchor_accuracy(Q, anchors, test_corpus, train_corpus, label_name):
     train_matrix = scipy.sparse.lil_matrix((len(train_corpus.documents), num_topics * len(train_corpus.vocabulary)))
 
     for i, doc in enumerate(train_corpus.documents):
-        for j, t in enumerate(doc.tokens):
-            train_matrix[i, t.token * num_topics + doc.metadata[attr][j]] += 1
+        for j, t in enumerate(pipeline.token_types(doc.tokens)):
+            train_matrix[i, t * num_topics + doc.metadata[attr][j]] += 1
 
     for i, doc in enumerate(test_corpus.documents):
-        for j, t in enumerate(doc.tokens):
-            test_matrix[i, t.token * num_topics + doc.metadata[attr][j]] += 1
+        for j, t in enumerate(pipeline.token_types(doc.tokens)):
+            test_matrix[i, t * num_topics + doc.metadata[attr][j]] += 1
 
     lr = LogisticRegression()
     lr.fit(train_matrix, train_target)
@@ -214,7 +216,7 @@ def coherence(reference_corpus, topic_summary, epsilon=1e-2):
     counts = collections.Counter()
     pair_counts = collections.Counter()
     for doc in reference_corpus.documents:
-        doc_set = set(tl.token for tl in doc.tokens).intersection(word_set)
+        doc_set = set(pipeline.token_types(doc.tokens)).intersection(word_set)
         counts.update(doc_set)
         pair_counts.update(itertools.product(doc_set, doc_set))
 
@@ -273,8 +275,8 @@ def topic_word_divergence(corpus, topics, attr='z'):
             continue
         p = np.mean(topics[:, doc.metadata[attr]], axis=1)
         q = np.zeros_like(p)
-        for t in doc.tokens:
-            q[t.token] += 1
+        for t in pipeline.token_types(doc.tokens):
+            q[t] += 1
         q /= np.sum(q)
         m = (p + q) / 2
         entropy += scipy.stats.entropy(p, m) + scipy.stats.entropy(q, m)
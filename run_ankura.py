@@ -192,6 +192,7 @@ def run_experiment(corpus_name, model, num_topics, seed):
         split = split_corpus[1]
     else:
         train_corpus, test_corpus = ankura.pipeline.train_test_split(corpus, random_seed=seed, return_ids=True)
+    np.random.seed(seed)
 
     train = train_corpus[1]
     train_labeled_docs = set(train_corpus[0])